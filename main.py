@@ -1,13 +1,8 @@
+from src.extract import getMergedPRs
+from src.transform import processRawFiles
+import asyncio
 import logging
 import os
-import sys
-
-scriptDir = os.path.dirname(os.path.abspath(__file__))
-srcDir = os.path.abspath(os.path.join(scriptDir, "src"))
-sys.path.insert(0, srcDir)
-
-from extract import getMergedPRs
-from transform import processRawFiles
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -20,14 +15,14 @@ def main():
     of pull request data.
 
     It first extracts merged PRs from the specified repository,
-    saves the raw data as JSON files, and then processes these files
-    to produce transformed CSV outputs.
+    saves the raw data as Parquet files, and then processes these files
+    to produce transformed Parquet outputs.
 
     Returns:
         None
     """
 
-    projectRoot = scriptDir
+    projectRoot = os.path.dirname(os.path.abspath(__file__))
     rawDataDir = os.path.join(projectRoot, "data", "raw")
     transformedDataDir = os.path.join(projectRoot, "data", "transformed")
     os.makedirs(rawDataDir, exist_ok=True)
@@ -35,12 +30,12 @@ def main():
 
     logging.info("Starting PR data extraction...")
     """
-    Extract merged PRs and save as JSON files.
+    Extract merged PRs and save as Parquet files.
     Replace 'owner/repo' with the actual repository name and optional date filters
     'since' and 'until'.
     """
     repo = "Scytale-exercise/scytale-repo3"
-    getMergedPRs(repo, perPage=100, since=None, until=None)
+    asyncio.run(getMergedPRs(repo, perPage=100, since=None, until=None))
 
     logging.info("Starting PR data transformation...")
     processRawFiles(rawDataDir, transformedDataDir)
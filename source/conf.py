@@ -9,7 +9,7 @@
 import os
 import sys
 
-sys.path.insert(0, os.path.abspath("../src"))
+sys.path.insert(0, os.path.abspath(".."))
 
 project = "JuniorDataEngineerAssignment"
 copyright = "2025, Patterson Rainbird-Webb"
@@ -2,176 +2,460 @@
 
 This module fetches merged pull requests from a specified GitHub repository,
 including details about code reviews and check statuses, and saves the raw data
-as JSON files.
+as Parquet files. Each page of PRs, together with its reviews and the status check
+rollup of its head commit, is fetched with a single GitHub GraphQL query over
+a shared HTTP/2 httpx client.
+Requests are paced only once GitHub's rate limit headers report a low remaining
+budget, and rate limited or failed requests are retried with exponential backoff.
 
 Functions:
 - getMergedPRs(repo, perPage=100, since=None, until=None): Fetch merged PRs from
   the specified repository.
-- getReviews(repo, pr_number, headers): Fetch reviews for a specific PR.
-- getCheckStatus(repo, sha, headers): Fetch check run statuses for a specific
-  commit SHA.
+- summarizeReviews(pr_number, reviews): Determine approval status and number of
+  unique reviewers for a PR.
+- checksPassed(pr_number, commits): Determine whether the status checks of a
+  PR's head commit succeeded.
 - main(): Main function to execute the extraction process.
 """
 
-from datetime import datetime
+from datetime import datetime, timezone
 from dotenv import load_dotenv
+from src.records import PRRecord
 from yaspin import yaspin
 import argparse
-import json
+import asyncio
+import ciso8601
+import httpx
 import logging
+import msgspec
 import os
-import requests
+import pyarrow as pa
+import pyarrow.parquet as pq
+import time
+
+__all__ = ["getMergedPRs", "summarizeReviews", "checksPassed"]
 
 load_dotenv()
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+GRAPHQL_URL = "https://api.github.com/graphql"
+MAX_CONNECTIONS = 64
+REQUEST_TIMEOUT_SECONDS = 60
+MAX_RETRIES = 5
+MAX_BACKOFF_SECONDS = 60
+SECONDARY_RATE_LIMIT_SECONDS = 60
+RATE_LIMIT_PACING_THRESHOLD = 500
+
+MERGED_PRS_QUERY = """
+query(
+  $owner: String!
+  $name: String!
+  $perPage: Int!
+  $cursor: String
+  $orderBy: IssueOrder!
+) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(
+      states: MERGED
+      first: $perPage
+      after: $cursor
+      orderBy: $orderBy
+    ) {
+      nodes {
+        number
+        title
+        author { login }
+        createdAt
+        updatedAt
+        mergedAt
+        reviews(last: 100) { nodes { author { login } state } }
+        commits(last: 1) { nodes { commit { statusCheckRollup { state } } } }
+      }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
 
-def getReviews(repo, pr_number, headers):
+def _parseDate(date):
     """
-    Fetches reviews for a specific pull request and determines if it has been approved.
+    Parses a YYYY-MM-DD date filter into a UTC datetime at midnight.
+
+    Parameters:
+        date (str): Date in the format YYYY-MM-DD.
+    Returns:
+        datetime: Timezone-aware datetime comparable with GitHub timestamps.
+    """
+
+    return datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+def _parseTimestamp(timestamp):
+    """
+    Parses a GitHub ISO 8601 timestamp (YYYY-MM-DDTHH:MM:SSZ).
+
+    Parameters:
+        timestamp (str): Timestamp as returned by the GitHub API.
+    Returns:
+        datetime: Timezone-aware UTC datetime.
+    """
+
+    return ciso8601.parse_datetime(timestamp)
+
+
+def _updateRateLimit(pacing, responseHeaders):
+    """
+    Schedules when the next request may be sent. While the remaining budget is at
+    or above RATE_LIMIT_PACING_THRESHOLD requests go out immediately; below it,
+    the remaining budget is spread evenly over the time left until it resets.
+    GraphQL budgets count query points rather than requests, so the threshold
+    leaves headroom for pages costing more than one point.
+
+    Parameters:
+        pacing (dict): Pacing state shared by all GitHub API calls, holding the
+            monotonic time at which the next request may be sent.
+        responseHeaders (Mapping): Headers of the latest GitHub API response.
+    Returns:
+        None
+    """
+
+    remaining = responseHeaders.get("X-RateLimit-Remaining")
+    reset = responseHeaders.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return
+
+    remaining = int(remaining)
+    if remaining >= RATE_LIMIT_PACING_THRESHOLD:
+        pacing["nextRequestAt"] = 0.0
+        return
+
+    window = max(int(reset) - time.time(), 1)
+    interval = window / max(remaining, 1)
+    pacing["nextRequestAt"] = time.monotonic() + interval
+
+
+async def _waitForRateLimit(pacing):
+    """
+    Sleeps until the pacing state allows the next GitHub API request.
+
+    Parameters:
+        pacing (dict): Pacing state shared by all GitHub API calls.
+    Returns:
+        None
+    """
+
+    delay = pacing["nextRequestAt"] - time.monotonic()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def _rateLimitDelay(responseHeaders):
+    """
+    Determines how long to wait after GitHub reported a rate limit.
+
+    Parameters:
+        responseHeaders (Mapping): Headers of the rate limited response.
+    Returns:
+        float: Seconds to wait. Honours Retry-After, waits for the reset when the
+        primary budget is exhausted, and otherwise waits at least
+        SECONDARY_RATE_LIMIT_SECONDS as GitHub advises for secondary limits.
+    """
+
+    retryAfter = responseHeaders.get("Retry-After")
+    if retryAfter is not None:
+        return float(retryAfter)
+
+    reset = responseHeaders.get("X-RateLimit-Reset")
+    if responseHeaders.get("X-RateLimit-Remaining") == "0" and reset is not None:
+        return max(int(reset) - time.time(), 0)
+
+    return SECONDARY_RATE_LIMIT_SECONDS
+
+
+def _isRateLimited(response):
+    """
+    Determines whether a failed GitHub API response is a rate limit rather than
+    a permanent error such as missing token scopes or SSO enforcement.
+
+    Parameters:
+        response (httpx.Response): The failed response.
+    Returns:
+        bool: True for 429 responses, and for 403 responses that carry
+        Retry-After, report an exhausted budget, or mention a secondary rate
+        limit in their message.
+    """
+
+    if response.status_code == 429:
+        return True
+    if response.status_code != 403:
+        return False
+
+    if (
+        "Retry-After" in response.headers
+        or response.headers.get("X-RateLimit-Remaining") == "0"
+    ):
+        return True
+
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    message = body.get("message", "") if isinstance(body, dict) else ""
+    return "secondary rate limit" in message.lower()
+
+
+def _retryDelay(response, attempt):
+    """
+    Determines how long to wait before retrying a failed GitHub API request.
+
+    Parameters:
+        response (httpx.Response): The failed response.
+        attempt (int): Zero-based number of the attempt that failed.
+    Returns:
+        float: Seconds to wait, or None if the request should not be retried.
+    """
+
+    if _isRateLimited(response):
+        return _rateLimitDelay(response.headers)
+    if response.status_code >= 500:
+        return min(2**attempt, MAX_BACKOFF_SECONDS)
+    return None
+
+
+async def _fetchGraphQL(client, pacing, query, variables):
+    """
+    Performs a rate limited GitHub GraphQL query and returns its data, retrying
+    on rate limits (429, rate limited 403s or RATE_LIMITED GraphQL errors),
+    server (5xx) errors and transport errors.
+
+    Parameters:
+        client (httpx.AsyncClient): Shared HTTP client for GitHub API calls,
+            carrying the authorization headers.
+        pacing (dict): Pacing state shared by all GitHub API calls.
+        query (str): GraphQL query document.
+        variables (dict): Variables for the GraphQL query.
+    Returns:
+        dict: The "data" member of the GraphQL response.
+    """
+
+    payload = {"query": query, "variables": variables}
+    for attempt in range(MAX_RETRIES + 1):
+        await _waitForRateLimit(pacing)
+        try:
+            r = await client.post(GRAPHQL_URL, json=payload)
+        except httpx.TransportError as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = min(2**attempt, MAX_BACKOFF_SECONDS)
+            logging.warning(f"GraphQL request failed with {e!r}, retrying in {delay}s")
+            await asyncio.sleep(delay)
+            continue
+
+        _updateRateLimit(pacing, r.headers)
+        if r.is_success:
+            body = r.json()
+            errors = body.get("errors")
+            if not errors:
+                return body["data"]
+
+            rateLimited = any(error.get("type") == "RATE_LIMITED" for error in errors)
+            if not rateLimited or attempt == MAX_RETRIES:
+                raise ValueError(f"GraphQL query failed: {errors}")
+            reason = "was rate limited"
+            delay = _rateLimitDelay(r.headers)
+        else:
+            reason = f"failed with status {r.status_code}"
+            delay = _retryDelay(r, attempt)
+            if delay is None or attempt == MAX_RETRIES:
+                r.raise_for_status()
+
+        logging.warning(f"GraphQL request {reason}, retrying in {delay:.0f}s")
+        await asyncio.sleep(delay)
+
+
+def summarizeReviews(pr_number, reviews):
+    """
+    Determines if a pull request has been approved from its reviews.
 
     Parameters:
-        repo (str): GitHub repository in the format 'owner/repo'.
         pr_number (int): Pull request number.
-        headers (dict): Headers for the GitHub API request, including authorization.
+        reviews (list): Review nodes of the PR in chronological order, each with
+            the reviewer's login and the review state.
     Returns:
         approved (bool): True if the PR has at least one approval.
         numReviewers (int): Number of unique reviewers for the PR.
     """
 
-    url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}/reviews"
-    r = requests.get(url, headers=headers)
-    r.raise_for_status()
-    reviews = r.json()
-
-    logging.debug(f"PR #{pr_number} reviews: {reviews}")
+    logging.debug("PR #%s reviews: %s", pr_number, reviews)
 
-    latestReviewPerUser = {}
+    reviewers = set()
+    approvers = set()
     for review in reviews:
-        user = review["user"]["login"]
-        latestReviewPerUser[user] = review["state"]
+        user = (review["author"] or {}).get("login", "ghost")
+        reviewers.add(user)
+        if review["state"] == "APPROVED":
+            approvers.add(user)
+        else:
+            approvers.discard(user)
 
-    approved = any(state == "APPROVED" for state in latestReviewPerUser.values())
-    numReviewers = len(latestReviewPerUser)
+    return bool(approvers), len(reviewers)
 
-    return approved, numReviewers
 
-
-def getCheckStatus(repo, sha, headers):
+def checksPassed(pr_number, commits):
     """
-    Fetches the check run statuses for a specific commit SHA.
+    Determines whether the status checks of a pull request's head commit passed.
 
     Parameters:
-        repo (str): GitHub repository in the format 'owner/repo'.
-        sha (str): Commit SHA.
-        headers (dict): Headers for the GitHub API request, including authorization.
+        pr_number (int): Pull request number.
+        commits (list): Commit nodes of the PR, containing only the head commit.
     Returns:
-        bool: True if all check runs have concluded successfully, False otherwise.
+        bool: True if the status check rollup of the head commit succeeded,
+        False otherwise or if the commit has no checks.
     """
 
-    url = f"https://api.github.com/repos/{repo}/commits/{sha}/check-runs"
-    r = requests.get(url, headers=headers)
-    r.raise_for_status()
-    data = r.json()
+    if not commits:
+        return False
 
-    checkRuns = data.get("check_runs", [])
+    rollup = commits[0]["commit"]["statusCheckRollup"]
+    logging.debug("PR #%s status check rollup: %s", pr_number, rollup)
+    return rollup is not None and rollup["state"] == "SUCCESS"
 
-    if not checkRuns:
-        return False
 
-    logging.debug(f"Commit {sha} check runs: {json.dumps(checkRuns, indent=2)}")
-    return all(run.get("conclusion") == "success" for run in checkRuns)
+def _collectMergedPRs(nodes, sinceDate, untilDate):
+    """
+    Converts a page of GraphQL pull request nodes into PR records, keeping only
+    PRs merged within the requested date range.
 
+    Parameters:
+        nodes (list): Pull request nodes, ordered by last update, newest first,
+            when sinceDate is set.
+        sinceDate (datetime): Keep PRs merged at or after this time, or None.
+        untilDate (datetime): Keep PRs merged at or before this time, or None.
+    Returns:
+        records (list[PRRecord]): Records for the PRs merged within the range.
+        reachedSince (bool): True if a PR last updated before sinceDate was
+            found, meaning no later page can contain matching PRs.
+    """
 
-def getMergedPRs(repo: str, perPage: int = 100, since: str = None, until: str = None):
+    records = []
+    for pr in nodes:
+        if sinceDate is not None and _parseTimestamp(pr["updatedAt"]) < sinceDate:
+            return records, True
+
+        mergedAt = _parseTimestamp(pr["mergedAt"])
+        if sinceDate is not None and mergedAt < sinceDate:
+            continue
+        if untilDate is not None and mergedAt > untilDate:
+            continue
+
+        approved, num_reviewers = summarizeReviews(pr["number"], pr["reviews"]["nodes"])
+        records.append(
+            PRRecord(
+                PRNum=pr["number"],
+                Title=pr["title"],
+                Author=(pr["author"] or {}).get("login", "ghost"),
+                CreatedAt=pr["createdAt"],
+                MergedAt=pr["mergedAt"],
+                Num_Reviewers=num_reviewers,
+                CR_Passed=approved,
+                Checks_Passed=checksPassed(pr["number"], pr["commits"]["nodes"]),
+            )
+        )
+
+    return records, False
+
+
+async def getMergedPRs(
+    repo: str, perPage: int = 100, since: str = None, until: str = None
+):
     """
     Fetches merged pull requests from the specified GitHub repository.
 
+    Each page of PRs is fetched with one GraphQL query that also returns the
+    reviews and head commit check status of every PR, paginating with the
+    cursor returned by the previous page. Without 'since', PRs are ordered by
+    creation, newest first, which stays stable while paginating. With 'since',
+    they are ordered by last update, newest first; since a PR is updated when
+    it is merged, pagination stops at the first PR last updated before 'since'.
+    A PR updated mid-run can then shift across a page boundary and be returned
+    twice, so records are deduplicated by PR number before being saved.
+
     Parameters:
         repo (str): GitHub repository in the format 'owner/repo'.
         perPage (int): Number of PRs to fetch per page (max 100).
         since (str): Fetch PRs merged since this date (YYYY-MM-DD).
         until (str): Fetch PRs merged until this date (YYYY-MM-DD).
     Returns:
-        list: List of dictionaries containing merged PR data:
-            - PRNum (int): Pull request number.
-            - Title (str): Pull request title.
-            - Author (str): Pull request author.
-            - CreatedAt (str): Creation timestamp of the PR.
-            - MergedAt (str): Merge timestamp of the PR.
-            - Num_Reviewers (int): Number of unique reviewers.
-            - CR_Passed (bool): Code review passed status.
-            - Checks_Passed (bool): Automated checks passed status.
+        list[PRRecord]: Merged PR records with their review and check status.
     """
     token = os.getenv("GITHUB_TOKEN")
     if not token:
         raise ValueError("GITHUB_TOKEN not found in environment variables")
 
     headers = {"Authorization": f"token {token}"}
-    baseUrl = f"https://api.github.com/repos/{repo}/pulls"
-    params = {"state": "closed", "perPage": perPage}
+    owner, name = repo.split("/", 1)
+    variables = {
+        "owner": owner,
+        "name": name,
+        "perPage": perPage,
+        "cursor": None,
+        "orderBy": {
+            "field": "UPDATED_AT" if since else "CREATED_AT",
+            "direction": "DESC",
+        },
+    }
     PRs = []
-    page = 1
 
     scriptDir = os.path.dirname(os.path.abspath(__file__))
     projectRoot = os.path.abspath(os.path.join(scriptDir, ".."))
     rawDataDir = os.path.join(projectRoot, "data", "raw")
     os.makedirs(rawDataDir, exist_ok=True)
 
+    pacing = {"nextRequestAt": 0.0}
+    limits = httpx.Limits(
+        max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS
+    )
+    sinceDate = _parseDate(since) if since else None
+    untilDate = _parseDate(until) if until else None
+
     with yaspin(text="Fetching PRs...", color="cyan") as spinner:
         try:
-            while True:
-                params["page"] = page
-                response = requests.get(baseUrl, headers=headers, params=params)
-                response.raise_for_status()
-                data = response.json()
-
-                if not data:
-                    break
-
-                for pr in data:
-                    if not pr.get("merged_at"):
-                        continue
-
-                    mergedAt = datetime.strptime(pr["merged_at"], "%Y-%m-%dT%H:%M:%SZ")
-
-                    if since and mergedAt < datetime.strptime(since, "%Y-%m-%d"):
-                        continue
-                    if until and mergedAt > datetime.strptime(until, "%Y-%m-%d"):
-                        continue
-
-                    prInfo = {
-                        "PRNum": pr["number"],
-                        "Title": pr["title"],
-                        "Author": pr["user"]["login"],
-                        "CreatedAt": pr["created_at"],
-                        "MergedAt": pr["merged_at"],
-                    }
-
-                    approved, num_reviewers = getReviews(repo, pr["number"], headers)
-                    prInfo["Num_Reviewers"] = num_reviewers
-                    prInfo["CR_Passed"] = approved
-                    prInfo["Checks_Passed"] = getCheckStatus(
-                        repo, pr["head"]["sha"], headers
+            async with httpx.AsyncClient(
+                http2=True,
+                limits=limits,
+                headers=headers,
+                timeout=REQUEST_TIMEOUT_SECONDS,
+            ) as client:
+                while True:
+                    data = await _fetchGraphQL(
+                        client, pacing, MERGED_PRS_QUERY, variables
                     )
+                    pullRequests = data["repository"]["pullRequests"]
 
-                    PRs.append(prInfo)
+                    records, reachedSince = _collectMergedPRs(
+                        pullRequests["nodes"], sinceDate, untilDate
+                    )
+                    PRs.extend(records)
 
-                page += 1
+                    pageInfo = pullRequests["pageInfo"]
+                    if reachedSince or not pageInfo["hasNextPage"]:
+                        break
+                    variables["cursor"] = pageInfo["endCursor"]
 
             spinner.ok("✔")
 
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             spinner.fail("✖")
             logging.error(f"Error fetching PRs: {e}")
 
+    PRs = list({pr.PRNum: pr for pr in PRs}.values())
     outPath = os.path.join(
-        rawDataDir, f"PRs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        rawDataDir, f"PRs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet"
     )
-    with open(outPath, "w") as f:
-        json.dump(PRs, f, indent=4)
+    pq.write_table(pa.Table.from_pylist(msgspec.to_builtins(PRs)), outPath)
 
     logging.info(f"Fetched {len(PRs)} merged PRs from {repo}")
     logging.info(f"Raw PR data saved to {outPath}")
@@ -213,4 +497,4 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
-    prs = getMergedPRs(args.repo, since=args.since, until=args.until)
+    prs = asyncio.run(getMergedPRs(args.repo, since=args.since, until=args.until))
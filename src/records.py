@@ -0,0 +1,34 @@
+"""
+Module defining the pull request record shared by the extraction and
+transformation steps.
+
+Classes:
+- PRRecord: A merged pull request with its code review and check status.
+"""
+
+import msgspec
+
+
+class PRRecord(msgspec.Struct):
+    """
+    A merged pull request with its code review and check status.
+
+    Attributes:
+        PRNum (int): Pull request number.
+        Title (str): Pull request title.
+        Author (str): Pull request author.
+        CreatedAt (str): Creation timestamp of the PR.
+        MergedAt (str): Merge timestamp of the PR.
+        Num_Reviewers (int): Number of unique reviewers.
+        CR_Passed (bool): Code review passed status.
+        Checks_Passed (bool): Automated checks passed status.
+    """
+
+    PRNum: int
+    Title: str
+    Author: str
+    CreatedAt: str
+    MergedAt: str
+    Num_Reviewers: int
+    CR_Passed: bool
+    Checks_Passed: bool
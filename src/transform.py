@@ -1,103 +1,211 @@
 """
 Module for transforming raw pull request data into a structured format.
 
-This module reads raw JSON files containing pull request data, processes
-them to compute additional fields, and saves the transformed data as CSV files.
+This module reads raw Parquet or JSON files containing pull request data,
+processes them to compute additional fields, and saves the transformed data as
+Parquet files.
 
 Functions:
-- transformPRData(df): Transforms a DataFrame of pull request data.
-- processRawFiles(rawDataDir, transformedDataDir): Processes all raw JSON files
-in the specified directory and saves transformed CSV files.
+- readRawFile(filePath): Reads a raw Parquet or JSON file into an Arrow table.
+- transformPRData(table): Transforms an Arrow table of pull request data.
+- processRawFile(filename, rawDataDir, transformedDataDir): Transforms a single
+raw file and saves it as a Parquet file.
+- processRawFiles(rawDataDir, transformedDataDir): Processes all raw files
+in the specified directory and saves transformed Parquet files.
 - main(): Main function to execute the transformation process.
 """
 
-import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from src.records import PRRecord
+import ijson
 import logging
+import msgspec
 import os
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+LARGE_FILE_BYTES = 50 * 1024 * 1024
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+RAW_FILE_EXTENSIONS = (".parquet", ".json")
+STREAM_BATCH_SIZE = 10_000
 
-def transformPRData(df):
+
+def readRawFile(filePath):
+    """
+    Reads a raw file of pull request records into an Arrow table.
+
+    Parquet files are read directly. JSON files up to LARGE_FILE_BYTES are
+    decoded in one go with msgspec straight into PRRecord structs, while larger
+    ones are streamed with ijson and converted to Arrow in batches of
+    STREAM_BATCH_SIZE records, so only one batch of Python objects is held in
+    memory at a time.
+
+    Parameters:
+        filePath (str): Path to the raw Parquet or JSON file.
+    Returns:
+        pa.Table: Table with one row per pull request.
+    """
+
+    if filePath.endswith(".parquet"):
+        return pq.read_table(filePath)
+
+    if os.path.getsize(filePath) <= LARGE_FILE_BYTES:
+        with open(filePath, "rb") as f:
+            records = msgspec.json.decode(f.read(), type=list[PRRecord])
+        return pa.Table.from_pylist(msgspec.to_builtins(records))
+
+    batches = []
+    with open(filePath, "rb") as f:
+        items = ijson.items(f, "item", use_float=True)
+        while batch := list(islice(items, STREAM_BATCH_SIZE)):
+            records = [msgspec.convert(item, PRRecord) for item in batch]
+            batches.append(pa.RecordBatch.from_pylist(msgspec.to_builtins(records)))
+
+    if not batches:
+        return pa.table({})
+    return pa.Table.from_batches(batches)
+
+
+def _setColumn(table, name, column):
+    """
+    Replaces the column with the given name in an Arrow table.
+
+    Parameters:
+        table (pa.Table): Table containing the column.
+        name (str): Name of the column to replace.
+        column (pa.Array or pa.ChunkedArray): New column values.
+    Returns:
+        pa.Table: Table with the column replaced.
+    """
+
+    return table.set_column(table.schema.get_field_index(name), name, column)
+
+
+def transformPRData(table):
     """
-    Transforms the pull request DataFrame by converting date fields,
+    Transforms the pull request table by converting date fields,
     computing quality gate status, and calculating time to merge.
 
     Parameters:
-        df (pd.DataFrame): DataFrame containing raw pull request data:
+        table (pa.Table): Table containing raw pull request data:
             - CreatedAt (str): Creation timestamp of the PR.
             - MergedAt (str): Merge timestamp of the PR.
             - CR_Passed (bool): Code review passed status.
             - Checks_Passed (bool): Automated checks passed status.
     Returns:
-        pd.DataFrame: Transformed DataFrame with additional computed fields:
-            - CreatedAt (datetime): Parsed creation timestamp.
-            - MergedAt (datetime): Parsed merge timestamp.
+        pa.Table: Transformed table with additional computed fields:
+            - CreatedAt (timestamp): Parsed creation timestamp.
+            - MergedAt (timestamp): Parsed merge timestamp.
             - CR_Passed (bool): Code review passed status.
             - Checks_Passed (bool): Automated checks passed status.
             - AllQualityGatesPassed (bool): True if both CR_Passed and Checks_Passed
               are True.
-            - TimeToMerge (timedelta): Time difference between MergedAt and CreatedAt.
+            - TimeToMerge (duration): Time difference between MergedAt and CreatedAt.
     """
 
-    if df.empty:
-        logging.warning("Input DataFrame is empty. No data to transform.")
-        return df
-
-    df["CreatedAt"] = pd.to_datetime(df["CreatedAt"], errors="coerce").dt.tz_localize(
-        None
+    if table.num_rows == 0:
+        logging.warning("Input table is empty. No data to transform.")
+        return table
+
+    for name in ("CreatedAt", "MergedAt"):
+        if not pa.types.is_timestamp(table[name].type):
+            table = _setColumn(
+                table,
+                name,
+                pc.strptime(
+                    table[name],
+                    format=TIMESTAMP_FORMAT,
+                    unit="s",
+                    error_is_null=True,
+                ),
+            )
+    for name in ("CR_Passed", "Checks_Passed"):
+        if not pa.types.is_boolean(table[name].type):
+            table = _setColumn(table, name, pc.cast(table[name], pa.bool_()))
+
+    table = table.append_column(
+        "AllQualityGatesPassed", pc.and_(table["CR_Passed"], table["Checks_Passed"])
     )
-    df["MergedAt"] = pd.to_datetime(df["MergedAt"], errors="coerce").dt.tz_localize(
-        None
+    table = table.append_column(
+        "TimeToMerge", pc.subtract(table["MergedAt"], table["CreatedAt"])
     )
-    df["CR_Passed"] = df["CR_Passed"].astype(bool)
-    df["Checks_Passed"] = df["Checks_Passed"].astype(bool)
-    df["AllQualityGatesPassed"] = df["CR_Passed"] & df["Checks_Passed"]
-    df["TimeToMerge"] = df["MergedAt"] - df["CreatedAt"]
 
-    return df
+    return table
 
 
-def processRawFiles(rawDataDir, transformedDataDir):
+def processRawFile(filename, rawDataDir, transformedDataDir):
     """
-    Processes all raw JSON files in the specified directory, transforms
-    the pull request data, and saves the results as CSV files.
+    Transforms a single raw Parquet or JSON file and saves the result as a
+    Parquet file.
 
     Parameters:
-        rawDataDir (str): Directory containing raw JSON files.
-        transformedDataDir (str): Directory to save transformed CSV files.
+        filename (str): Name of the raw file inside rawDataDir.
+        rawDataDir (str): Directory containing raw Parquet or JSON files.
+        transformedDataDir (str): Directory to save transformed Parquet files.
     Returns:
         None
     """
-    os.makedirs(transformedDataDir, exist_ok=True)
+    filePath = os.path.join(rawDataDir, filename)
+    try:
+        table = readRawFile(filePath)
+    except (msgspec.DecodeError, ijson.JSONError, pa.ArrowInvalid) as e:
+        logging.error(f"Error decoding data from file {filePath}: {e}")
+        return
+
+    if table.num_rows == 0:
+        logging.warning(f"No data found in {filename}, skipping.")
+        return
 
-    for filename in os.listdir(rawDataDir):
-        if not filename.endswith(".json"):
-            continue
+    transformed = transformPRData(table)
 
-        filePath = os.path.join(rawDataDir, filename)
-        try:
-            with open(filePath, "r") as f:
-                prs = json.load(f)
-        except json.JSONDecodeError as e:
-            logging.error(f"Error decoding JSON from file {filePath}: {e}")
-            continue
+    baseName = os.path.splitext(filename)[0]
+    outPath = os.path.join(transformedDataDir, f"{baseName}_transformed.parquet")
 
-        df = pd.DataFrame(prs)
-        if df.empty:
-            logging.warning(f"No data found in {filename}, skipping.")
-            continue
+    pq.write_table(transformed, outPath, compression="zstd")
+    logging.info(f"Transformed data saved to {outPath}")
 
-        dfTransformed = transformPRData(df)
 
-        baseName = os.path.splitext(filename)[0]
-        outPath = os.path.join(transformedDataDir, f"{baseName}_transformed.csv")
+def processRawFiles(rawDataDir, transformedDataDir):
+    """
+    Processes all raw Parquet and JSON files in the specified directory,
+    transforms the pull request data, and saves the results as Parquet files.
+
+    Files are independent of each other and are processed in parallel across
+    worker processes.
+
+    Parameters:
+        rawDataDir (str): Directory containing raw Parquet or JSON files.
+        transformedDataDir (str): Directory to save transformed Parquet files.
+    Returns:
+        None
+    """
+    os.makedirs(transformedDataDir, exist_ok=True)
 
-        dfTransformed.to_csv(outPath, index=False)
-        logging.info(f"Transformed data saved to {outPath}")
+    with os.scandir(rawDataDir) as entries:
+        filenames = [
+            entry.name
+            for entry in entries
+            if entry.name.endswith(RAW_FILE_EXTENSIONS) and entry.is_file()
+        ]
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(
+            executor.map(
+                partial(
+                    processRawFile,
+                    rawDataDir=rawDataDir,
+                    transformedDataDir=transformedDataDir,
+                ),
+                filenames,
+            )
+        )
 
 
 def main():